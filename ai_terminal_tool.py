@@ -5,187 +5,295 @@ A simple terminal GUI application for using various AI services.
 """
 
 import os
-import asyncio
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator, Callable, Tuple
 from dataclasses import dataclass
 
+from textual import work
 from textual.app import App, ComposeResult
 from textual.containers import Horizontal, Vertical
 from textual.widgets import (
     Header, Footer, Select, Input, Button, TextArea, 
-    Static, Label, LoadingIndicator, Markdown
+    Static, Label, LoadingIndicator, RichLog
 )
 from textual.binding import Binding
+from rich.markup import escape
+
+# Faster JSON codec for the config file (optional)
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 # API Clients
 try:
     import openai
 except ImportError:
-    openai = None
+    openai = None  # type: ignore[assignment]
 
 try:
     import anthropic
 except ImportError:
-    anthropic = None
+    anthropic = None  # type: ignore[assignment]
 
 try:
     from google.generativeai import configure, GenerativeModel
     import google.generativeai as genai
 except ImportError:
-    genai = None
+    genai = None  # type: ignore[assignment]
 
 try:
-    import requests
+    import httpx
 except ImportError:
-    requests = None
+    httpx = None  # type: ignore[assignment]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AIProvider:
     """Data class for AI provider configuration"""
     name: str
-    models: list
+    models: Tuple[str, ...]
     requires_api_key: bool = True
     base_url: Optional[str] = None
 
 
+# Supported providers, shared by every AIClient
+_PROVIDERS: Dict[str, AIProvider] = {
+    'OpenAI': AIProvider('OpenAI', ('gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo')),
+    'Claude': AIProvider('Claude', ('claude-3-5-sonnet-20241022', 'claude-3-5-haiku-20241022', 'claude-3-opus-20240229')),
+    'Gemini': AIProvider('Gemini', ('gemini-2.0-flash-exp', 'gemini-1.5-pro', 'gemini-1.5-flash')),
+    'Perplexity': AIProvider('Perplexity', ('llama-3.1-sonar-small-128k-online', 'llama-3.1-sonar-large-128k-online'), base_url="https://api.perplexity.ai")
+}
+
+
 class ConfigManager:
     """Manages application configuration and API keys"""
     
-    def __init__(self):
+    def __init__(self) -> None:
         self.config_dir = Path.home() / ".ai-terminal-tool"
         self.config_file = self.config_dir / "config.json"
+        # Disk access is deferred until the config is first needed
+        self._config: Dict[str, Any] = {}
+        self._api_keys: Dict[str, str] = {}
+        self._loaded = False
+    
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Configuration data, loaded from disk on first access"""
+        self._ensure_loaded()
+        return self._config
+    
+    def _ensure_loaded(self) -> None:
+        """Create the config directory and read the config file, once"""
+        if self._loaded:
+            return
         self.config_dir.mkdir(exist_ok=True)
-        self.config = self.load_config()
+        self._config = self.load_config()
+        self._api_keys = self._config.setdefault('api_keys', {})
+        self._loaded = True
     
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
         if self.config_file.exists():
             try:
+                if orjson:
+                    return orjson.loads(self.config_file.read_bytes())
                 with open(self.config_file, 'r') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError):
                 pass
         return {}
     
-    def save_config(self):
+    def save_config(self) -> None:
         """Save configuration to file"""
+        # Write to a temporary file and swap it in, so an interrupted
+        # save never leaves a truncated config behind
+        tmp_file = self.config_file.with_suffix(".json.tmp")
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            if orjson:
+                data = orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self.config, indent=2).encode()
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
         except IOError:
-            pass
+            tmp_file.unlink(missing_ok=True)
     
     def get_api_key(self, provider: str) -> Optional[str]:
         """Get API key for provider"""
-        return self.config.get('api_keys', {}).get(provider)
+        self._ensure_loaded()
+        return self._api_keys.get(provider)
     
-    def set_api_key(self, provider: str, api_key: str):
+    def set_api_key(self, provider: str, api_key: str) -> None:
         """Set API key for provider"""
-        if 'api_keys' not in self.config:
-            self.config['api_keys'] = {}
-        self.config['api_keys'][provider] = api_key
+        self._ensure_loaded()
+        self._api_keys[provider] = api_key
         self.save_config()
 
 
 class AIClient:
     """Unified client for different AI providers"""
     
-    def __init__(self, config_manager: ConfigManager):
-        self.config_manager = config_manager
-        self.providers = {
-            'OpenAI': AIProvider('OpenAI', ['gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo']),
-            'Claude': AIProvider('Claude', ['claude-3-5-sonnet-20241022', 'claude-3-5-haiku-20241022', 'claude-3-opus-20240229']),
-            'Gemini': AIProvider('Gemini', ['gemini-2.0-flash-exp', 'gemini-1.5-pro', 'gemini-1.5-flash']),
-            'Perplexity': AIProvider('Perplexity', ['llama-3.1-sonar-small-128k-online', 'llama-3.1-sonar-large-128k-online'], base_url="https://api.perplexity.ai")
+    def __init__(self) -> None:
+        self.providers = _PROVIDERS
+        # Select widget options, built once per provider
+        self.provider_options = [(name, name) for name in self.providers]
+        self.model_options = {
+            name: [(model, model) for model in provider.models]
+            for name, provider in self.providers.items()
+        }
+        # Shared HTTP/2 client for Perplexity, created on first use
+        self._httpx: Optional["httpx.AsyncClient"] = None
+        # Async SDK clients, cached per API key
+        self._openai_clients: Dict[str, "openai.AsyncOpenAI"] = {}
+        self._anthropic_clients: Dict[str, "anthropic.AsyncAnthropic"] = {}
+        # Gemini model handles, cached per (API key, model)
+        self._gemini_models: Dict[Tuple[str, str], "GenerativeModel"] = {}
+        # Provider name -> streaming request method
+        self._dispatch: Dict[str, Callable[[str, str, str], AsyncIterator[str]]] = {
+            'OpenAI': self._openai_request,
+            'Claude': self._claude_request,
+            'Gemini': self._gemini_request,
+            'Perplexity': self._perplexity_request,
         }
     
-    async def get_response(self, provider: str, model: str, message: str) -> str:
-        """Get response from specified AI provider"""
-        api_key = self.config_manager.get_api_key(provider.lower())
+    async def stream_response(self, provider: str, model: str, message: str, api_key: Optional[str]) -> AsyncIterator[str]:
+        """Stream response text from specified AI provider as it arrives"""
         if not api_key:
-            return f"Error: No API key configured for {provider}"
+            yield f"Error: No API key configured for {provider}"
+            return
         
-        try:
-            if provider == 'OpenAI':
-                return await self._openai_request(api_key, model, message)
-            elif provider == 'Claude':
-                return await self._claude_request(api_key, model, message)
-            elif provider == 'Gemini':
-                return await self._gemini_request(api_key, model, message)
-            elif provider == 'Perplexity':
-                return await self._perplexity_request(api_key, model, message)
-            else:
-                return f"Error: Unsupported provider {provider}"
-        except Exception as e:
-            return f"Error: {str(e)}"
+        handler = self._dispatch.get(provider)
+        if handler is None:
+            yield f"Error: Unsupported provider {provider}"
+            return
+        
+        # Errors raised mid-stream propagate to the caller, which has to
+        # finish off any partial line before reporting them
+        async for chunk in handler(api_key, model, message):
+            yield chunk
     
-    async def _openai_request(self, api_key: str, model: str, message: str) -> str:
-        """Make request to OpenAI API"""
+    async def _openai_request(self, api_key: str, model: str, message: str) -> AsyncIterator[str]:
+        """Stream request to OpenAI API"""
         if not openai:
-            return "Error: OpenAI library not installed. Run: pip install openai"
+            yield "Error: OpenAI library not installed. Run: pip install openai"
+            return
         
-        client = openai.OpenAI(api_key=api_key)
-        response = await asyncio.to_thread(
-            client.chat.completions.create,
+        client = self._openai_clients.get(api_key)
+        if client is None:
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                http_client=openai.DefaultAsyncHttpxClient(http2=True)
+            )
+            self._openai_clients[api_key] = client
+        
+        stream = await client.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": message}],
-            max_tokens=1000
+            max_tokens=1000,
+            stream=True
         )
-        return response.choices[0].message.content
+        async for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
     
-    async def _claude_request(self, api_key: str, model: str, message: str) -> str:
-        """Make request to Claude API"""
+    async def _claude_request(self, api_key: str, model: str, message: str) -> AsyncIterator[str]:
+        """Stream request to Claude API"""
         if not anthropic:
-            return "Error: Anthropic library not installed. Run: pip install anthropic"
+            yield "Error: Anthropic library not installed. Run: pip install anthropic"
+            return
+        
+        client = self._anthropic_clients.get(api_key)
+        if client is None:
+            client = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                http_client=anthropic.DefaultAsyncHttpxClient(http2=True)
+            )
+            self._anthropic_clients[api_key] = client
         
-        client = anthropic.Anthropic(api_key=api_key)
-        response = await asyncio.to_thread(
-            client.messages.create,
+        async with client.messages.stream(
             model=model,
             max_tokens=1000,
             messages=[{"role": "user", "content": message}]
-        )
-        return response.content[0].text
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
     
-    async def _gemini_request(self, api_key: str, model: str, message: str) -> str:
-        """Make request to Gemini API"""
+    async def _gemini_request(self, api_key: str, model: str, message: str) -> AsyncIterator[str]:
+        """Stream request to Gemini API"""
         if not genai:
-            return "Error: Google AI library not installed. Run: pip install google-generativeai"
+            yield "Error: Google AI library not installed. Run: pip install google-generativeai"
+            return
         
-        genai.configure(api_key=api_key)
-        model_instance = genai.GenerativeModel(model)
-        response = await asyncio.to_thread(model_instance.generate_content, message)
-        return response.text
-    
-    async def _perplexity_request(self, api_key: str, model: str, message: str) -> str:
-        """Make request to Perplexity API"""
-        if not requests:
-            return "Error: Requests library not installed. Run: pip install requests"
+        key = (api_key, model)
+        model_instance = self._gemini_models.get(key)
+        if model_instance is None:
+            genai.configure(api_key=api_key)
+            model_instance = genai.GenerativeModel(model)
+            self._gemini_models[key] = model_instance
         
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+        response = await model_instance.generate_content_async(message, stream=True)
+        async for chunk in response:
+            yield chunk.text
+    
+    async def _perplexity_request(self, api_key: str, model: str, message: str) -> AsyncIterator[str]:
+        """Stream request to Perplexity API"""
+        if not httpx:
+            yield "Error: HTTPX library not installed. Run: pip install 'httpx[http2]'"
+            return
+        
+        if self._httpx is None:
+            self._httpx = httpx.AsyncClient(
+                http2=True,
+                timeout=60,
+                headers={"Content-Type": "application/json"}
+            )
+        
+        headers = {"Authorization": f"Bearer {api_key}"}
         data = {
             "model": model,
             "messages": [{"role": "user", "content": message}],
-            "max_tokens": 1000
+            "max_tokens": 1000,
+            "stream": True
         }
         
-        response = await asyncio.to_thread(
-            requests.post,
+        async with self._httpx.stream(
+            "POST",
             "https://api.perplexity.ai/chat/completions",
             headers=headers,
             json=data
-        )
-        
-        if response.status_code == 200:
-            return response.json()['choices'][0]['message']['content']
-        else:
-            return f"Error: {response.status_code} - {response.text}"
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                yield f"Error: {response.status_code} - {response.text}"
+                return
+            
+            # Server-sent events: one "data: {...}" frame per chunk
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
+                delta = json.loads(payload)['choices'][0].get('delta', {})
+                if delta.get('content'):
+                    yield delta['content']
+    
+    async def close(self) -> None:
+        """Close any open HTTP connections"""
+        for openai_client in self._openai_clients.values():
+            await openai_client.close()
+        self._openai_clients.clear()
+        for anthropic_client in self._anthropic_clients.values():
+            await anthropic_client.close()
+        self._anthropic_clients.clear()
+        if self._httpx is not None:
+            await self._httpx.aclose()
+            self._httpx = None
 
 
 class AITerminalApp(App):
@@ -237,11 +345,19 @@ class AITerminalApp(App):
         Binding("enter", "send_message", "Send", priority=True),
     ]
     
-    def __init__(self):
+    def __init__(self) -> None:
         super().__init__()
         self.config_manager = ConfigManager()
-        self.ai_client = AIClient(self.config_manager)
+        self.ai_client = AIClient()
         self.selected_provider = "OpenAI"
+        self._current_provider_key = "openai"
+        self._current_api_key: Optional[str] = None
+        self._pending_requests = 0
+        self._sends_started = 0
+        self._last_writer: Optional[object] = None
+        # Last values rendered into the status widgets
+        self._last_status: Optional[str] = None
+        self._last_status_tuple: Optional[Tuple[str, str, bool]] = None
         self.selected_model = "gpt-4o"
     
     def compose(self) -> ComposeResult:
@@ -253,14 +369,14 @@ class AITerminalApp(App):
                 with Vertical(classes="config-section"):
                     yield Label("AI Provider:")
                     yield Select(
-                        [(name, name) for name in self.ai_client.providers.keys()],
+                        self.ai_client.provider_options,
                         value="OpenAI",
                         id="provider_select"
                     )
                     
                     yield Label("Model:")
                     yield Select(
-                        [(model, model) for model in self.ai_client.providers["OpenAI"].models],
+                        self.ai_client.model_options["OpenAI"],
                         value="gpt-4o",
                         id="model_select"
                     )
@@ -289,7 +405,8 @@ class AITerminalApp(App):
                 
                 with Vertical(classes="output-container"):
                     yield Label("AI Response:")
-                    yield Markdown("Welcome! Select an AI provider and enter your API key to get started.", id="output_area")
+                    # Oldest lines are dropped once the cap is reached, keeping memory flat
+                    yield RichLog(id="output_area", markup=True, wrap=True, max_lines=2000)
         
         with Horizontal(classes="status-bar"):
             yield LoadingIndicator(id="loading")
@@ -297,30 +414,58 @@ class AITerminalApp(App):
         
         yield Footer()
     
-    def on_mount(self):
+    def on_mount(self) -> None:
         """Initialize the application"""
-        loading = self.query_one("#loading", LoadingIndicator)
-        loading.visible = False
+        # Cache widget handles so event handlers skip the selector lookup
+        self._loading = self.query_one("#loading", LoadingIndicator)
+        self._output_area = self.query_one("#output_area", RichLog)
+        self._status_text = self.query_one("#status_text", Static)
+        self._status_info = self.query_one("#status_info", Static)
+        self._message_input = self.query_one("#message_input", TextArea)
+        self._model_select = self.query_one("#model_select", Select)
+        self._api_key_input = self.query_one("#api_key_input", Input)
+        
+        self._loading.visible = False
+        self._output_area.write("Welcome! Select an AI provider and enter your API key to get started.")
+        # Read the config only after the first frame has been drawn
+        self.call_after_refresh(self._load_key_status)
+    
+    def _load_key_status(self) -> None:
+        """Look up the selected provider's key and show it in the sidebar"""
+        self._refresh_current_key()
         self.update_status_info()
     
-    def on_select_changed(self, event: Select.Changed):
+    async def on_unmount(self) -> None:
+        """Release network resources on shutdown"""
+        await self.ai_client.close()
+    
+    def _refresh_current_key(self) -> None:
+        """Cache the config key and API key for the selected provider"""
+        self._current_provider_key = self.selected_provider.lower()
+        self._current_api_key = self.config_manager.get_api_key(self._current_provider_key)
+    
+    def on_select_changed(self, event: Select.Changed) -> None:
         """Handle selection changes"""
         if event.select.id == "provider_select":
-            self.selected_provider = event.value
+            # The initial Changed event repeats the default provider; the
+            # key lookup for it is left to _load_key_status
+            if str(event.value) == self.selected_provider:
+                return
+            self.selected_provider = str(event.value)
+            self._refresh_current_key()
             # Update model select based on provider
-            model_select = self.query_one("#model_select", Select)
             models = self.ai_client.providers[self.selected_provider].models
-            model_select.set_options([(model, model) for model in models])
+            self._model_select.set_options(self.ai_client.model_options[self.selected_provider])
             if models:
-                model_select.value = models[0]
+                self._model_select.value = models[0]
                 self.selected_model = models[0]
             self.update_status_info()
         
         elif event.select.id == "model_select":
-            self.selected_model = event.value
+            self.selected_model = str(event.value)
             self.update_status_info()
     
-    def on_button_pressed(self, event: Button.Pressed):
+    def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses"""
         if event.button.id == "save_key_btn":
             self.save_api_key()
@@ -329,30 +474,31 @@ class AITerminalApp(App):
         elif event.button.id == "clear_btn":
             self.action_clear_output()
     
-    def save_api_key(self):
+    def save_api_key(self) -> None:
         """Save the entered API key"""
-        api_key_input = self.query_one("#api_key_input", Input)
+        api_key_input = self._api_key_input
         if api_key_input.value.strip():
             self.config_manager.set_api_key(
-                self.selected_provider.lower(),
+                self._current_provider_key,
                 api_key_input.value.strip()
             )
             api_key_input.value = ""
+            self._refresh_current_key()
             self.update_status("API key saved successfully!")
             self.update_status_info()
         else:
             self.update_status("Please enter an API key")
     
-    def action_send_message(self):
+    def action_send_message(self) -> None:
         """Send message to AI provider"""
-        message_input = self.query_one("#message_input", TextArea)
+        message_input = self._message_input
         message = message_input.text.strip()
         
         if not message:
             self.update_status("Please enter a message")
             return
         
-        if not self.config_manager.get_api_key(self.selected_provider.lower()):
+        if not self._current_api_key:
             self.update_status("Please enter and save your API key first")
             return
         
@@ -360,72 +506,113 @@ class AITerminalApp(App):
         message_input.text = ""
         self.process_message(message)
     
-    async def process_message(self, message: str):
-        """Process message asynchronously"""
-        loading = self.query_one("#loading", LoadingIndicator)
-        output_area = self.query_one("#output_area", Markdown)
+    @work(exclusive=False)
+    async def process_message(self, message: str) -> None:
+        """Process message in a background worker, so sends can overlap"""
+        loading = self._loading
+        output_area = self._output_area
+        provider = self.selected_provider
+        api_key = self._current_api_key
         
         # Show loading
+        self._pending_requests += 1
+        self._sends_started += 1
+        send_index = self._sends_started
+        started_during_other_send = self._pending_requests > 1
         loading.visible = True
-        self.update_status(f"Sending to {self.selected_provider}...")
+        self.update_status(f"Sending to {provider}...")
+        
+        output_area.write(f"[bold]You:[/] {escape(message)}")
+        turn = object()
+        self._last_writer = None
         
+        def write_reply(text: str) -> None:
+            # Label the reply again whenever another send wrote in between,
+            # naming the message once this turn has overlapped another send
+            if self._last_writer is not turn:
+                if started_during_other_send or self._sends_started != send_index:
+                    output_area.write(f"[bold]{provider}[/] (re: {escape(message[:40])}):")
+                else:
+                    output_area.write(f"[bold]{provider}:[/]")
+                self._last_writer = turn
+            output_area.write(text)
+        
+        pending = ""
         try:
-            # Get AI response
-            response = await self.ai_client.get_response(
-                self.selected_provider,
+            # Stream the response, writing each completed line as it arrives
+            async for chunk in self.ai_client.stream_response(
+                provider,
                 self.selected_model,
-                message
-            )
+                message,
+                api_key
+            ):
+                pending += chunk
+                if "\n" in chunk:
+                    *lines, pending = pending.split("\n")
+                    for line in lines:
+                        write_reply(escape(line))
             
-            # Update output
-            conversation = f"**You:** {message}\n\n**{self.selected_provider}:** {response}\n\n---\n\n"
-            current_content = output_area.markdown
-            if current_content == "Welcome! Select an AI provider and enter your API key to get started.":
-                output_area.update(conversation)
-            else:
-                output_area.update(conversation + current_content)
+            if pending:
+                write_reply(escape(pending))
+            write_reply("---")
             
-            self.update_status("Response received!")
+            # Only report completion once no other send is still running
+            if self._pending_requests == 1:
+                self.update_status("Response received!")
             
         except Exception as e:
+            if pending:
+                write_reply(escape(pending))
             self.update_status(f"Error: {str(e)}")
-            output_area.update(f"**Error:** {str(e)}\n\n---\n\n" + output_area.markdown)
+            write_reply(f"[bold]Error:[/] {escape(str(e))}")
+            write_reply("---")
         
         finally:
-            loading.visible = False
+            self._pending_requests -= 1
+            loading.visible = self._pending_requests > 0
     
-    def action_clear_output(self):
+    def action_clear_output(self) -> None:
         """Clear the conversation output"""
-        output_area = self.query_one("#output_area", Markdown)
-        output_area.update("Conversation cleared.")
+        self._output_area.clear()
         self.update_status("Conversation cleared")
     
-    def update_status(self, message: str):
+    def update_status(self, message: str) -> None:
         """Update status bar message"""
-        status_text = self.query_one("#status_text", Static)
-        status_text.update(message)
+        if message == self._last_status:
+            return
+        self._status_text.update(message)
+        self._last_status = message
     
-    def update_status_info(self):
+    def update_status_info(self) -> None:
         """Update sidebar status information"""
-        status_info = self.query_one("#status_info", Static)
-        has_key = bool(self.config_manager.get_api_key(self.selected_provider.lower()))
+        has_key = bool(self._current_api_key)
+        status_tuple = (self.selected_provider, self.selected_model, has_key)
+        if status_tuple == self._last_status_tuple:
+            return
         key_status = "✓" if has_key else "✗"
         
         info = f"""Provider: {self.selected_provider}
 Model: {self.selected_model}
 API Key: {key_status} {"Configured" if has_key else "Not set"}"""
         
-        status_info.update(info)
+        self._status_info.update(info)
+        self._last_status_tuple = status_tuple
     
-    def action_quit(self):
+    async def action_quit(self) -> None:
         """Quit the application"""
         self.exit()
 
 
-def main():
+def main() -> None:
     """Main entry point"""
     app = AITerminalApp()
-    app.run()
+    # Run on the faster libuv-based event loop when available
+    try:
+        import uvloop
+    except ImportError:
+        app.run()
+    else:
+        app.run(loop=uvloop.new_event_loop())
 
 
 if __name__ == "__main__":
@@ -47,7 +47,7 @@ install_dependencies() {
             sudo yum install -y python3 python3-pip git || sudo dnf install -y python3 python3-pip git
             ;;
         *)
-            echo "❓ Unknown system. Please install Python 3.8+, pip, and git manually."
+            echo "❓ Unknown system. Please install Python 3.11+, pip, and git manually."
             ;;
     esac
 }